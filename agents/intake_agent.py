@@ -1,12 +1,77 @@
+import asyncio
+import hashlib
 import json
+import re
+import weakref
+from collections import Counter, OrderedDict
 from datetime import datetime
-from typing import Dict, Any
-from langchain_openai import ChatOpenAI
-from textblob import TextBlob
+from typing import Dict, Any, List, Optional
+import numpy as np
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 
+try:
+    import redis
+except ImportError:
+    redis = None
+
 from state import SupportState, QueryType, UrgencyLevel, SentimentLevel, Message
-from config import Config, URGENCY_KEYWORDS, ROUTING_KEYWORDS, SENTIMENT_THRESHOLDS
+from config import (
+    Config, URGENCY_KEYWORDS, ROUTING_KEYWORDS, SENTIMENT_THRESHOLDS, KEYWORD_AUTOMATON,
+    compile_keyword_pattern
+)
+
+# Sentiment thresholds in ascending order, with the level for each bin
+# (scores below the first threshold are ANGRY)
+SENTIMENT_BINS = np.array([
+    SENTIMENT_THRESHOLDS["very_negative"],
+    SENTIMENT_THRESHOLDS["negative"],
+    SENTIMENT_THRESHOLDS["neutral"],
+    SENTIMENT_THRESHOLDS["positive"],
+    SENTIMENT_THRESHOLDS["very_positive"]
+])
+SENTIMENT_BIN_LEVELS = [
+    SentimentLevel.ANGRY,
+    SentimentLevel.VERY_NEGATIVE,
+    SentimentLevel.NEGATIVE,
+    SentimentLevel.NEUTRAL,
+    SentimentLevel.POSITIVE,
+    SentimentLevel.VERY_POSITIVE
+]
+
+# Shared VADER analyzer so the lexicon is only loaded once per process
+VADER_ANALYZER = SentimentIntensityAnalyzer()
+
+# Direct value -> member lookup, skipping the Enum constructor dispatch
+QUERY_TYPE_BY_VALUE = QueryType._value2member_map_
+
+# Keyword tables for bulk scoring: every routing/urgency keyword gets an ID,
+# with one row per keyword in the category and urgency priority tables
+SCORING_KEYWORDS = list(dict.fromkeys(
+    [keyword for keywords in ROUTING_KEYWORDS.values() for keyword in keywords] +
+    [keyword for keywords in URGENCY_KEYWORDS.values() for keyword in keywords]
+))
+SCORING_KEYWORD_IDS = {keyword: keyword_id for keyword_id, keyword in enumerate(SCORING_KEYWORDS)}
+SCORING_PATTERN = compile_keyword_pattern(SCORING_KEYWORDS)
+SCORING_CATEGORIES = list(ROUTING_KEYWORDS)
+KEYWORD_CATEGORY_TABLE = np.array([
+    [1 if keyword in ROUTING_KEYWORDS[category] else 0 for category in SCORING_CATEGORIES]
+    for keyword in SCORING_KEYWORDS
+], dtype=np.int64)
+KEYWORD_URGENCY_TABLE = np.array([
+    Config.URGENCY_KEYWORD_PRIORITY.get(keyword, len(Config.URGENCY_ORDER))
+    for keyword in SCORING_KEYWORDS
+], dtype=np.int64)
+
+# Enum lookups for converting bulk scoring output, indexed by category
+# column and by urgency priority (the extra slot is the MEDIUM default)
+SCORING_QUERY_TYPES = np.array([QUERY_TYPE_BY_VALUE[category] for category in SCORING_CATEGORIES], dtype=object)
+SCORING_URGENCY_LEVELS = np.array(list(Config.URGENCY_ORDER) + [UrgencyLevel.MEDIUM], dtype=object)
+
+# Matches "[index] category" lines in batched LLM classification responses
+CLASSIFICATION_LINE_PATTERN = re.compile(r"\[(\d+)\]\s*(\w+)")
+
+# Replaces index brackets and quotes inside customer text in batched prompts
+PROMPT_QUERY_TRANSLATION = str.maketrans({"[": "(", "]": ")", '"': "'"})
 
 class IntakeAgent:
     """
@@ -14,16 +79,63 @@ class IntakeAgent:
     """
 
     def __init__(self):
-        self.llm = ChatOpenAI(
-            model=Config.MODEL_NAME,
-            temperature = Config.TEMPERATURE,
-            max_tokens = Config.MAX_TOKENS,
-            api_key=Config.OPENAI_API_KEY
-        )
+        # LLM clients are created on first use, so workers that only
+        # hit keyword routing never import or initialize them
+        self._llm = None
+        self._client = None
+
+        # Semaphores bounding concurrent LLM calls, one per event loop
+        self._llm_semaphores: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
         
-        self.sentiemnt_analyzer = SentimentIntensityAnalyzer()
+        self.sentiment_analyzer = VADER_ANALYZER
+
+        # In-flight jobs for the Batch API
+        self.pending_batches: Dict[str, Dict[str, tuple[str, List[SupportState]]]] = {}
+
+        # LLM classification cache, shared through Redis when configured
+        self.classification_cache: OrderedDict[str, QueryType] = OrderedDict()
+        self.redis = None
+        if redis and Config.REDIS_URL:
+            # Short timeouts so an unreachable Redis degrades to cache misses
+            self.redis = redis.Redis.from_url(
+                Config.REDIS_URL,
+                socket_timeout=Config.REDIS_TIMEOUT,
+                socket_connect_timeout=Config.REDIS_TIMEOUT
+            )
 
-    def analyzer_query_type(self, query:str)-> QueryType:
+    @property
+    def llm(self):
+        """ChatOpenAI model used for fallback classification"""
+        if self._llm is None:
+            from langchain_openai import ChatOpenAI
+
+            self._llm = ChatOpenAI(
+                model=Config.MODEL_NAME,
+                temperature = Config.CLASSIFICATION_TEMPERATURE,
+                max_tokens = Config.MAX_TOKENS,
+                max_retries=3,
+                api_key=Config.OPENAI_API_KEY
+            )
+        return self._llm
+
+    @property
+    def client(self):
+        """OpenAI client used for the Batch API"""
+        if self._client is None:
+            from openai import OpenAI
+
+            self._client = OpenAI(api_key=Config.OPENAI_API_KEY)
+        return self._client
+
+    @property
+    def llm_semaphore(self) -> asyncio.Semaphore:
+        """Semaphore bounding concurrent LLM calls on the running event loop"""
+        loop = asyncio.get_running_loop()
+        if loop not in self._llm_semaphores:
+            self._llm_semaphores[loop] = asyncio.Semaphore(Config.MAX_CONCURRENCY)
+        return self._llm_semaphores[loop]
+
+    def analyze_query_type(self, query:str)-> QueryType:
         """
         Classify the query type based on keywords and content
         
@@ -34,45 +146,99 @@ class IntakeAgent:
             QueryType: Classified query type
         """
 
-        query_lower = query.lower()
-
-        # Count keyword matches for each category
-        type_scores = {}
-        for query_type, keywords in ROUTING_KEYWORDS.items():
-            scope = sum(1 for keyword in keywords if keyword in query_lower)
-            type_scores[query_type] = score
+        type_scores, _ = self._scan_keywords(query.lower())
 
         # Return the type with highest score, or UNKNOWN if no matches
         if max(type_scores.values()) > 0:
-            return QueryType(max(type_scores, key=type_scores.get))
+            return QUERY_TYPE_BY_VALUE[max(type_scores, key=type_scores.get)]
 
         # Use LLM as fallback for complex classification
         return self._llm_classify_query(query)
 
-    def analyzer_urgency(self, query: str)-> UrgencyLevel:
+    def _scan_keywords(self, query_lower: str) -> tuple[Dict[str, int], int]:
+        """
+        Count routing keyword matches per category and find the highest
+        urgency priority in a single scan of the query
+        
+        With the keyword automaton the scan always reads the whole query,
+        since routing counts depend on every match. Only the regex fallback,
+        which scans urgency separately, stops early at the top priority.
+        
+        Args:
+            query_lower: Lowercased customer query text
+            
+        Returns:
+            tuple: (matched keywords per category, best urgency priority
+            indexing Config.URGENCY_ORDER, or len(Config.URGENCY_ORDER) if
+            no urgency keyword matched)
+        """
+
+        # Track the best (lowest) urgency priority index seen
+        best_priority = len(Config.URGENCY_ORDER)
+
+        if KEYWORD_AUTOMATON is None:
+            matched_keywords = set(Config.ROUTING_PATTERN.findall(query_lower))
+            category_counts = Counter(
+                category
+                for keyword in matched_keywords
+                for category in Config.ROUTING_KEYWORD_CATEGORIES[keyword]
+            )
+            type_scores = {query_type: category_counts[query_type] for query_type in ROUTING_KEYWORDS}
+
+            for match in Config.URGENCY_PATTERN.finditer(query_lower):
+                best_priority = min(best_priority, Config.URGENCY_KEYWORD_PRIORITY[match.group(1)])
+                if best_priority == 0:
+                    break
+
+            return type_scores, best_priority
+
+        # Single pass over the query, counting each matched keyword once
+        type_scores = dict.fromkeys(ROUTING_KEYWORDS, 0)
+        matched_keywords = set()
+        for _, (keyword, tags, urgency_priority) in KEYWORD_AUTOMATON.iter(query_lower):
+            if keyword in matched_keywords:
+                continue
+            matched_keywords.add(keyword)
+
+            best_priority = min(best_priority, urgency_priority)
+            for category, kind in tags:
+                if kind == "routing":
+                    type_scores[category] += 1
+
+        return type_scores, best_priority
+
+    def analyze_urgency(self, query_lower: str)-> UrgencyLevel:
         """
         Determine urgency level based on keywords and sentiment
         
         Args:
-            query: Customer's query text
+            query_lower: Lowercased customer query text
             
         Returns:
             UrgencyLevel: Classified urgency level
         """
+        _, best_priority = self._scan_keywords(query_lower)
+        return self._urgency_from_priority(best_priority)
 
-        query_lower = query.lower()
-        
-        # Check for urgency keywords
-        for urgency_level, keywords in URGENCY_KEYWORDS.items():
-            if any(keyword in query_lower for keyword in keywords):
-                return urgency_level
+    def _urgency_from_priority(self, priority: int) -> UrgencyLevel:
+        """
+        Map an urgency priority index back to its UrgencyLevel
         
+        Args:
+            priority: Index into Config.URGENCY_ORDER
+            
+        Returns:
+            UrgencyLevel: Matching level, or MEDIUM if no keyword matched
+        """
+        if priority < len(Config.URGENCY_ORDER):
+            return Config.URGENCY_ORDER[priority]
+
         # Default to medium if no clear indicators
         return UrgencyLevel.MEDIUM
 
     def analyze_sentiment(self, query:str)-> tuple[SentimentLevel, float]:
         """
-        Analyze customer sentiment using multiple methods
+        Analyze customer sentiment using VADER's lexicon scorer
         
         Args:
             query: Customer's query text
@@ -83,31 +249,132 @@ class IntakeAgent:
 
         # Use VADER sentiment analyzer
         vader_scores = self.sentiment_analyzer.polarity_scores(query)
-        compound_score = vader_scores['compound']
-        
-        # Also use TextBlob as backup
-        blob = TextBlob(query)
-        textblob_score = blob.sentiment.polarity
-        
-        # Average the scores
-        avg_score = (compound_score + textblob_score) / 2
+        sentiment_score = vader_scores['compound']
 
         # Classify sentiment based on thresholds
-        if avg_score >= SENTIMENT_THRESHOLDS["very_positive"]:
+        if sentiment_score >= SENTIMENT_THRESHOLDS["very_positive"]:
             sentiment_level = SentimentLevel.VERY_POSITIVE
-        elif avg_score >= SENTIMENT_THRESHOLDS["positive"]:
+        elif sentiment_score >= SENTIMENT_THRESHOLDS["positive"]:
             sentiment_level = SentimentLevel.POSITIVE
-        elif avg_score >= SENTIMENT_THRESHOLDS["neutral"]:
+        elif sentiment_score >= SENTIMENT_THRESHOLDS["neutral"]:
             sentiment_level = SentimentLevel.NEUTRAL
-        elif avg_score >= SENTIMENT_THRESHOLDS["negative"]:
+        elif sentiment_score >= SENTIMENT_THRESHOLDS["negative"]:
             sentiment_level = SentimentLevel.NEGATIVE
-        elif avg_score >= SENTIMENT_THRESHOLDS["very_negative"]:
+        elif sentiment_score >= SENTIMENT_THRESHOLDS["very_negative"]:
             sentiment_level = SentimentLevel.VERY_NEGATIVE
         else:
             sentiment_level = SentimentLevel.ANGRY
         
-        return sentiment_level, avg_score
+        return sentiment_level, sentiment_score
     
+    def analyze_sentiment_batch(self, queries: List[str]) -> tuple[List[SentimentLevel], np.ndarray]:
+        """
+        Analyze sentiment for a batch of queries, classifying all scores at once
+        
+        Args:
+            queries: Customer query texts
+            
+        Returns:
+            tuple: (SentimentLevel per query, array of sentiment scores)
+        """
+
+        sentiment_scores = np.array([self.sentiment_analyzer.polarity_scores(query)['compound'] for query in queries], dtype=float)
+
+        # Each threshold is inclusive, so scores equal to a threshold land in the bin above it
+        bin_indices = np.searchsorted(SENTIMENT_BINS, sentiment_scores, side="right")
+        sentiment_levels = [SENTIMENT_BIN_LEVELS[index] for index in bin_indices]
+
+        return sentiment_levels, sentiment_scores
+
+    def score_keywords_batch(self, queries_lower: List[str]) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Score keyword matches for a batch of queries at once, for offline
+        re-scoring of historic tickets
+        
+        Args:
+            queries_lower: Lowercased customer query texts
+            
+        Returns:
+            tuple: (type scores with one column per SCORING_CATEGORIES entry,
+            urgency priority per query indexing Config.URGENCY_ORDER, where
+            len(Config.URGENCY_ORDER) means no urgency keyword matched)
+        """
+
+        row_offsets = [0]
+        keyword_ids = []
+        for query_lower in queries_lower:
+            if KEYWORD_AUTOMATON is None:
+                matched_keywords = set(SCORING_PATTERN.findall(query_lower))
+            else:
+                matched_keywords = {keyword for _, (keyword, _, _) in KEYWORD_AUTOMATON.iter(query_lower)}
+
+            keyword_ids.extend(SCORING_KEYWORD_IDS[keyword] for keyword in matched_keywords)
+            row_offsets.append(len(keyword_ids))
+
+        # Imported here so online workers never pay for loading Numba
+        from utils.keyword_scoring import score_keyword_rows
+
+        return score_keyword_rows(
+            np.array(row_offsets, dtype=np.int64),
+            np.array(keyword_ids, dtype=np.int64),
+            KEYWORD_CATEGORY_TABLE,
+            KEYWORD_URGENCY_TABLE,
+            len(Config.URGENCY_ORDER)
+        )
+
+    def analyze_corpus(self, queries: np.ndarray, llm_fallback: bool = False):
+        """
+        Re-analyze a corpus of historic queries column by column
+        
+        Keyword scoring, urgency and sentiment each run as one pass over
+        the whole column; results are only converted to enums at the end.
+        
+        Args:
+            queries: Array or list of customer query texts; every entry
+                must be a str
+            llm_fallback: Classify queries without keyword matches with the
+                LLM, Config.LLM_BATCH_SIZE queries per call, instead of
+                leaving them UNKNOWN. For large corpora prefer submit_batch,
+                which goes through the cheaper asynchronous Batch API
+            
+        Returns:
+            pd.DataFrame: One row per query with query_type, urgency_level,
+            sentiment_level and sentiment_score columns
+        """
+        import pandas as pd
+
+        # A fixed-width str dtype would silently turn None into "None"
+        queries = np.asarray(queries, dtype=object)
+        if not all(isinstance(query, str) for query in queries):
+            raise TypeError("analyze_corpus expects an array of query strings")
+
+        queries_lower = [query.lower() for query in queries]
+
+        type_scores, urgency_priorities = self.score_keywords_batch(queries_lower)
+        sentiment_levels, sentiment_scores = self.analyze_sentiment_batch(queries.tolist())
+
+        # Highest-scoring category per row, UNKNOWN where nothing matched
+        query_types = SCORING_QUERY_TYPES[type_scores.argmax(axis=1)]
+        unmatched = np.flatnonzero(type_scores.max(axis=1) == 0)
+        query_types[unmatched] = QueryType.UNKNOWN
+
+        if llm_fallback and len(unmatched):
+            # _llm_classify_queries splits the queries into LLM_BATCH_SIZE prompts
+            for index, query_type in zip(unmatched, self._llm_classify_queries(queries[unmatched].tolist())):
+                query_types[index] = query_type
+
+            still_unknown = sum(query_type is QueryType.UNKNOWN for query_type in query_types[unmatched])
+            if still_unknown:
+                print(f"⚠️ {still_unknown} of {len(unmatched)} unmatched queries left UNKNOWN after LLM fallback")
+
+        return pd.DataFrame({
+            "query": queries,
+            "query_type": query_types,
+            "urgency_level": SCORING_URGENCY_LEVELS[urgency_priorities],
+            "sentiment_level": sentiment_levels,
+            "sentiment_score": sentiment_scores
+        })
+
     def _llm_classify_query(self, query: str) -> QueryType:
         """
         Use LLM to classify complex queries
@@ -118,40 +385,376 @@ class IntakeAgent:
         Returns:
             QueryType: Classified query type
         """
+        return self._llm_classify_queries([query])[0]
+
+    def _llm_classify_queries(self, queries: List[str]) -> List[QueryType]:
+        """
+        Use a single LLM call to classify a batch of complex queries
+        
+        Args:
+            queries: Customer query texts
+            
+        Returns:
+            list: Classified query type for each query, in input order
+        """
+        cache_keys, classifications, uncached = self._lookup_classifications(queries)
+
+        classified = {}
+        for chunk_keys, chunk_queries in self._classification_chunks(uncached):
+            prompt = self._build_classification_prompt(chunk_queries)
+
+            try:
+                response = self.llm.invoke(prompt)
+                chunk_classified = self._parse_classifications(response.content, chunk_keys)
+                self._cache_classifications(chunk_classified)
+                classified.update(chunk_classified)
+            except Exception as e:
+                print(f"LLM classification failed for {len(chunk_keys)} queries: {e}")
+
+        return [
+            classification or classified.get(cache_key, QueryType.UNKNOWN)
+            for cache_key, classification in zip(cache_keys, classifications)
+        ]
+
+    async def _allm_classify_queries(self, queries: List[str]) -> List[QueryType]:
+        """
+        Async version of _llm_classify_queries, bounded by the LLM semaphore
+        
+        Redis calls run in a worker thread so they never block the event loop.
+        
+        Args:
+            queries: Customer query texts
+            
+        Returns:
+            list: Classified query type for each query, in input order
+        """
+        cache_keys, classifications, missing_keys = self._lookup_local_classifications(queries)
+        remote = {}
+        if self.redis is not None and missing_keys:
+            remote = await asyncio.to_thread(self._get_remote_classifications, missing_keys)
+        uncached = self._resolve_classifications(queries, cache_keys, classifications, remote)
+
+        # Chunks run concurrently, up to the semaphore's limit
+        chunk_results = await asyncio.gather(*(
+            self._allm_classify_chunk(chunk_keys, chunk_queries)
+            for chunk_keys, chunk_queries in self._classification_chunks(uncached)
+        ))
+
+        classified = {}
+        for chunk_classified in chunk_results:
+            classified.update(chunk_classified)
+
+        return [
+            classification or classified.get(cache_key, QueryType.UNKNOWN)
+            for cache_key, classification in zip(cache_keys, classifications)
+        ]
+
+    async def _allm_classify_chunk(self, cache_keys: List[str], queries: List[str]) -> Dict[str, QueryType]:
+        """
+        Classify one prompt's worth of uncached queries and cache the results
+        
+        Args:
+            cache_keys: Cache key for each query
+            queries: Customer query texts
+            
+        Returns:
+            dict: Classified query types keyed by cache key, empty on failure
+        """
+        prompt = self._build_classification_prompt(queries)
+
+        try:
+            async with self.llm_semaphore:
+                response = await self.llm.ainvoke(prompt)
+            classified = self._parse_classifications(response.content, cache_keys)
+            known = self._remember_classifications(classified)
+            if self.redis is not None and known:
+                await asyncio.to_thread(self._store_remote_classifications, known)
+            return classified
+        except Exception as e:
+            print(f"LLM classification failed for {len(cache_keys)} queries: {e}")
+            return {}
+
+    def _lookup_classifications(self, queries: List[str]) -> tuple[List[str], List[Optional[QueryType]], Dict[str, str]]:
+        """
+        Look up cached classifications for a batch of queries
+        
+        Args:
+            queries: Customer query texts
+            
+        Returns:
+            tuple: (cache key per query, cached query type or None per query,
+            distinct uncached queries keyed by cache key)
+        """
+        cache_keys, classifications, missing_keys = self._lookup_local_classifications(queries)
+
+        # One Redis round trip for everything the local cache missed
+        remote = self._get_remote_classifications(missing_keys)
+        uncached = self._resolve_classifications(queries, cache_keys, classifications, remote)
+
+        return cache_keys, classifications, uncached
+
+    def _lookup_local_classifications(self, queries: List[str]) -> tuple[List[str], List[Optional[QueryType]], List[str]]:
+        """
+        Look up classifications for a batch of queries in the local cache
+        
+        Args:
+            queries: Customer query texts
+            
+        Returns:
+            tuple: (cache key per query, cached query type or None per query,
+            distinct cache keys the local cache missed)
+        """
+        cache_keys = [self._classification_cache_key(query) for query in queries]
+        classifications = [self._get_local_classification(cache_key) for cache_key in cache_keys]
+        missing_keys = list(dict.fromkeys(
+            cache_key for cache_key, classification in zip(cache_keys, classifications) if classification is None
+        ))
+
+        return cache_keys, classifications, missing_keys
+
+    def _resolve_classifications(self, queries: List[str], cache_keys: List[str],
+                                 classifications: List[Optional[QueryType]],
+                                 remote: Dict[str, QueryType]) -> Dict[str, str]:
+        """
+        Fill local cache misses from Redis hits, in place
+        
+        Args:
+            queries: Customer query texts
+            cache_keys: Cache key per query
+            classifications: Cached query type or None per query, updated in place
+            remote: Redis hits keyed by cache key
+            
+        Returns:
+            dict: Distinct queries still uncached, keyed by cache key
+        """
+        for position, cache_key in enumerate(cache_keys):
+            if classifications[position] is None and cache_key in remote:
+                classifications[position] = remote[cache_key]
+                self._remember_classification(cache_key, remote[cache_key])
+
+        # Only send each distinct uncached query to the LLM once
+        uncached = {}
+        for query, cache_key, classification in zip(queries, cache_keys, classifications):
+            if classification is None and cache_key not in uncached:
+                uncached[cache_key] = query
+
+        return uncached
+
+    def _classification_chunks(self, uncached: Dict[str, str]) -> List[tuple[List[str], List[str]]]:
+        """
+        Split uncached queries into prompts of at most Config.LLM_BATCH_SIZE
+        queries, so neither the prompt nor the response outgrows the model
+        
+        Args:
+            uncached: Distinct uncached queries keyed by cache key
+            
+        Returns:
+            list: (cache keys, queries) for each chunk, in order
+        """
+        cache_keys = list(uncached)
+        queries = list(uncached.values())
+        batch_size = max(1, Config.LLM_BATCH_SIZE)
+
+        return [
+            (cache_keys[start:start + batch_size], queries[start:start + batch_size])
+            for start in range(0, len(cache_keys), batch_size)
+        ]
+
+    def _parse_classifications(self, content: str, cache_keys: List[str]) -> Dict[str, QueryType]:
+        """
+        Parse a batched LLM classification response
+        
+        Args:
+            content: LLM response text with "[index] category" lines
+            cache_keys: Cache key for each query in the prompt, in order
+            
+        Returns:
+            dict: Classified query types keyed by cache key
+        """
+        classified = {}
+        for index, label in CLASSIFICATION_LINE_PATTERN.findall(content):
+            position = int(index) - 1
+            if 0 <= position < len(cache_keys):
+                classified[cache_keys[position]] = self._map_classification(label)
+            else:
+                print(f"⚠️ LLM classification returned out-of-range index [{index}]")
+
+        missing = [str(position + 1) for position, cache_key in enumerate(cache_keys) if cache_key not in classified]
+        if missing:
+            print(f"⚠️ LLM classification missing indices: {', '.join(missing)}")
+
+        return classified
+
+    def _classification_cache_key(self, query: str) -> str:
+        """
+        Build the cache key for a query's LLM classification
+        
+        Args:
+            query: Customer's query text
+            
+        Returns:
+            str: Hash of the normalized query
+        """
+        normalized = query.strip().lower()
+        return "intake:" + hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    def _get_local_classification(self, cache_key: str) -> Optional[QueryType]:
+        """
+        Look up a classification in the in-process LRU cache
+        
+        Args:
+            cache_key: Key from _classification_cache_key
+            
+        Returns:
+            Optional[QueryType]: Cached query type, or None on a miss
+        """
+        if cache_key in self.classification_cache:
+            self.classification_cache.move_to_end(cache_key)
+            return self.classification_cache[cache_key]
+
+        return None
+
+    def _get_remote_classifications(self, cache_keys: List[str]) -> Dict[str, QueryType]:
+        """
+        Look up classifications in Redis with a single MGET
+        
+        Args:
+            cache_keys: Keys from _classification_cache_key
+            
+        Returns:
+            dict: Cached query types keyed by cache key, hits only
+        """
+        if self.redis is None or not cache_keys:
+            return {}
+
+        try:
+            values = self.redis.mget(cache_keys)
+        except Exception as e:
+            print(f"Classification cache lookup failed: {e}")
+            return {}
+
+        return {
+            cache_key: self._map_classification(value.decode("utf-8"))
+            for cache_key, value in zip(cache_keys, values)
+            if value is not None
+        }
+
+    def _cache_classifications(self, classified: Dict[str, QueryType]) -> None:
+        """
+        Store LLM classifications in the local cache and Redis
+        
+        UNKNOWN results are skipped so failed classifications are retried.
+        
+        Args:
+            classified: Classified query types keyed by cache key
+        """
+        self._store_remote_classifications(self._remember_classifications(classified))
+
+    def _remember_classifications(self, classified: Dict[str, QueryType]) -> Dict[str, QueryType]:
+        """
+        Store LLM classifications in the local cache, skipping UNKNOWN
+        
+        Args:
+            classified: Classified query types keyed by cache key
+            
+        Returns:
+            dict: The classifications that were cached
+        """
+        known = {cache_key: query_type for cache_key, query_type in classified.items() if query_type != QueryType.UNKNOWN}
+
+        for cache_key, query_type in known.items():
+            self._remember_classification(cache_key, query_type)
+
+        return known
+
+    def _store_remote_classifications(self, classified: Dict[str, QueryType]) -> None:
+        """
+        Write classifications to Redis in a single pipelined round trip
+        
+        Args:
+            classified: Classified query types keyed by cache key
+        """
+        if self.redis is None or not classified:
+            return
+
+        try:
+            pipeline = self.redis.pipeline(transaction=False)
+            for cache_key, query_type in classified.items():
+                pipeline.setex(cache_key, Config.CLASSIFICATION_CACHE_TTL, query_type.value)
+            pipeline.execute()
+        except Exception as e:
+            print(f"Classification cache write failed: {e}")
+
+    def _remember_classification(self, cache_key: str, query_type: QueryType) -> None:
+        """
+        Store a classification in the in-process LRU cache
+        
+        Args:
+            cache_key: Key from _classification_cache_key
+            query_type: Classified query type
+        """
+        self.classification_cache[cache_key] = query_type
+        self.classification_cache.move_to_end(cache_key)
+        if len(self.classification_cache) > Config.CLASSIFICATION_CACHE_SIZE:
+            self.classification_cache.popitem(last=False)
+
+    def _build_classification_prompt(self, queries: List[str]) -> str:
+        """
+        Build the classification prompt for a batch of queries
+        
+        Args:
+            queries: Customer query texts
+            
+        Returns:
+            str: Prompt asking for one "[index] category" line per query
+        """
+        numbered_queries = "\n".join(
+            f'[{index}] "{self._sanitize_prompt_query(query)}"' for index, query in enumerate(queries, start=1)
+        )
+
         prompt = f"""
-        Classify this customer support query into one of these categories:
+        Classify each customer support query below into one of these categories:
         - technical: API issues, bugs, integrations, technical problems
         - billing: payments, refunds, subscriptions, pricing, invoices
         - sales: upgrades, demos, new features, purchasing
         - general: account questions, how-to, basic support
         - complaint: complaints, dissatisfaction, problems with service
         
-        Query: "{query}"
+        Queries:
+        {numbered_queries}
         
-        Return only the category name (technical, billing, sales, general, or complaint):
+        Respond with one line per query in the form "[index] category", for example:
+        [1] technical
+        [2] billing
         """
 
-        try:
-            response = self.llm.invoke(prompt)
-            classification = response.content.strip().lower()
-
-            # Map to our enum
-            if classification in ["technical"]:
-                return QueryType.TECHNICAL
-            elif classification in ["billing"]:
-                return QueryType.BILLING
-            elif classification in ["sales"]:
-                return QueryType.SALES
-            elif classification in ["general"]:
-                return QueryType.GENERAL
-            elif classification in ["complaint"]:
-                return QueryType.COMPLAINT
-            else:
-                return QueryType.UNKNOWN
-                
-        except Exception as e:
-            print(f"LLM classification failed: {e}")
-            return QueryType.UNKNOWN
+        return prompt
+
+    def _sanitize_prompt_query(self, query: str) -> str:
+        """
+        Flatten a query onto one line and neutralize characters that could
+        forge "[index]" markers for other queries in a batched prompt
+        
+        Args:
+            query: Customer's query text
+            
+        Returns:
+            str: Query text safe to number in a batched prompt
+        """
+        return " ".join(query.split()).translate(PROMPT_QUERY_TRANSLATION)
+
+    def _map_classification(self, classification: str) -> QueryType:
+        """
+        Map an LLM category label to a QueryType
+        
+        Args:
+            classification: Category label returned by the LLM
+            
+        Returns:
+            QueryType: Matching query type, or UNKNOWN
+        """
+        # Map to our enum
+        return QUERY_TYPE_BY_VALUE.get(classification.strip().lower(), QueryType.UNKNOWN)
 
     def process_query(self, state: SupportState)-> SupportState:
         """
@@ -160,6 +763,339 @@ class IntakeAgent:
         Args:
             state: Current support state
             
+        Returns:
+            SupportState: Updated state with analysis
+        """
+        return self.process_queries([state])[0]
+
+    def process_queries(self, states: List[SupportState]) -> List[SupportState]:
+        """
+        Process a batch of incoming queries, sharing one LLM call for
+        all queries the keyword classifier cannot resolve
+        
+        Args:
+            states: Support states to analyze
+            
+        Returns:
+            list: Updated states with analysis, in input order
+        """
+
+        queries_lower = [state["original_query"].lower() for state in states]
+        query_types, urgency_levels, fallback_indices = self._keyword_classify_states(states, queries_lower)
+
+        # Classify all unresolved queries with a single LLM call
+        if fallback_indices:
+            fallback_queries = [states[index]["original_query"] for index in fallback_indices]
+            for index, query_type in zip(fallback_indices, self._llm_classify_queries(fallback_queries)):
+                query_types[index] = query_type
+
+        self._analyze_states(states, query_types, urgency_levels)
+
+        return states
+
+    async def aprocess_query(self, state: SupportState) -> SupportState:
+        """
+        Async version of process_query for concurrent intake
+        
+        Args:
+            state: Current support state
+            
+        Returns:
+            SupportState: Updated state with analysis
+        """
+        return (await self.aprocess_queries([state]))[0]
+
+    async def aprocess_queries(self, states: List[SupportState]) -> List[SupportState]:
+        """
+        Async version of process_queries, awaiting the LLM fallback so
+        other intakes can run while it is in flight
+        
+        Args:
+            states: Support states to analyze
+            
+        Returns:
+            list: Updated states with analysis, in input order
+        """
+
+        queries_lower = [state["original_query"].lower() for state in states]
+        query_types, urgency_levels, fallback_indices = self._keyword_classify_states(states, queries_lower)
+
+        if fallback_indices:
+            fallback_queries = [states[index]["original_query"] for index in fallback_indices]
+            for index, query_type in zip(fallback_indices, await self._allm_classify_queries(fallback_queries)):
+                query_types[index] = query_type
+
+        self._analyze_states(states, query_types, urgency_levels)
+
+        return states
+
+    def _keyword_classify_states(self, states: List[SupportState],
+                                 queries_lower: List[str]) -> tuple[List[Any], List[Any], List[int]]:
+        """
+        Classify states by keywords and collect the ones needing LLM fallback
+        
+        Args:
+            states: Support states to classify
+            queries_lower: Lowercased query text for each state
+            
+        Returns:
+            tuple: (query types, urgency levels, indices of states needing
+            LLM classification). States that failed analysis have a query
+            type and urgency level of None.
+        """
+
+        query_types = []
+        urgency_levels = []
+        fallback_indices = []
+
+        for index, (state, query_lower) in enumerate(zip(states, queries_lower)):
+            try:
+                type_scores, urgency_priority = self._scan_keywords(query_lower)
+            except Exception as e:
+                self._record_error(state, e)
+                query_types.append(None)
+                urgency_levels.append(None)
+                continue
+
+            urgency_levels.append(self._urgency_from_priority(urgency_priority))
+
+            if max(type_scores.values()) > 0:
+                query_types.append(QUERY_TYPE_BY_VALUE[max(type_scores, key=type_scores.get)])
+            else:
+                query_types.append(QueryType.UNKNOWN)
+                fallback_indices.append(index)
+
+        return query_types, urgency_levels, fallback_indices
+
+    def submit_batch(self, states: List[SupportState]) -> Optional[str]:
+        """
+        Analyze states for offline workloads, submitting all queries that
+        need LLM classification to the OpenAI Batch API
+        
+        Args:
+            states: Support states to analyze
+            
+        Returns:
+            Optional[str]: Batch ID to pass to collect_batch, or None if
+            nothing was submitted
+        """
+
+        if not Config.SUPPORT_CONFIG["enable_parallel_processing"]:
+            print("⚠️ Parallel processing disabled, classifying batch synchronously")
+            self.process_queries(states)
+            return None
+
+        queries_lower = [state["original_query"].lower() for state in states]
+        query_types, urgency_levels, fallback_indices = self._keyword_classify_states(states, queries_lower)
+
+        # Resolve cached classifications before uploading anything
+        fallback_queries = [states[index]["original_query"] for index in fallback_indices]
+        cache_keys, classifications, uncached = self._lookup_classifications(fallback_queries)
+        for index, classification in zip(fallback_indices, classifications):
+            if classification is not None:
+                query_types[index] = classification
+
+        self._analyze_states(states, query_types, urgency_levels)
+
+        if not uncached:
+            return None
+
+        # States sharing a cache key share one request and its result
+        states_by_key = {}
+        for index, cache_key, classification in zip(fallback_indices, cache_keys, classifications):
+            if classification is None:
+                states_by_key.setdefault(cache_key, []).append(states[index])
+
+        pending = {}
+        requests = []
+        for position, (cache_key, query) in enumerate(uncached.items()):
+            custom_id = f"query-{position}"
+            pending[custom_id] = (cache_key, states_by_key[cache_key])
+            requests.append({
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": Config.MODEL_NAME,
+                    "temperature": Config.CLASSIFICATION_TEMPERATURE,
+                    "max_tokens": Config.MAX_TOKENS,
+                    "messages": [
+                        {"role": "user", "content": self._build_classification_prompt([query])}
+                    ]
+                }
+            })
+
+        try:
+            batch_file = self.client.files.create(
+                file=("intake_batch.jsonl", "\n".join(json.dumps(request) for request in requests).encode("utf-8")),
+                purpose="batch"
+            )
+            batch = self.client.batches.create(
+                input_file_id=batch_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window="24h"
+            )
+        except Exception as e:
+            print(f"Batch submission failed: {e}")
+            return None
+
+        self.pending_batches[batch.id] = pending
+        print(f"📦 Submitted {len(requests)} queries for batch classification: {batch.id}")
+
+        return batch.id
+
+    def collect_batch(self, batch_id: str) -> Optional[List[SupportState]]:
+        """
+        Collect the results of a submitted classification batch
+        
+        Args:
+            batch_id: Batch ID returned by submit_batch
+            
+        Returns:
+            Optional[List[SupportState]]: Updated states, None if the
+            batch has not finished yet, or an empty list for a batch this
+            agent is not waiting on
+        """
+
+        if batch_id not in self.pending_batches:
+            print(f"⚠️ Unknown batch {batch_id}, nothing to collect")
+            return []
+
+        batch = self.client.batches.retrieve(batch_id)
+
+        if batch.status in ["validating", "in_progress", "finalizing", "cancelling"]:
+            return None
+
+        pending = self.pending_batches.pop(batch_id)
+        states = [state for _, key_states in pending.values() for state in key_states]
+
+        if batch.status != "completed":
+            print(f"Batch {batch_id} ended with status: {batch.status}")
+
+        # Expired and cancelled batches still return the requests they finished
+        if not batch.output_file_id:
+            return states
+
+        output = self.client.files.content(batch.output_file_id).text
+
+        classified = {}
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+
+            result = json.loads(line)
+            if result["custom_id"] not in pending:
+                continue
+
+            cache_key, key_states = pending[result["custom_id"]]
+            try:
+                content = result["response"]["body"]["choices"][0]["message"]["content"]
+                match = CLASSIFICATION_LINE_PATTERN.search(content)
+                if match:
+                    query_type = self._map_classification(match.group(2))
+                    classified[cache_key] = query_type
+                    for state in key_states:
+                        self._update_query_type(state, query_type)
+            except (KeyError, IndexError, TypeError) as e:
+                print(f"Batch result for {result['custom_id']} could not be parsed: {e}")
+
+        self._cache_classifications(classified)
+
+        return states
+
+    def _update_query_type(self, state: SupportState, query_type: QueryType) -> None:
+        """
+        Apply a late classification to an already analyzed state
+        
+        Args:
+            state: Support state analyzed by submit_batch
+            query_type: Query type from the batch results
+        """
+        state["query_type"] = query_type
+
+        analysis = state["debug_info"].get("intake_analysis")
+        if analysis is None:
+            return
+
+        analysis["query_type"] = query_type.value
+        content = self._analysis_message_content(
+            query_type, state["urgency_level"], state["sentiment_level"]
+        )
+
+        # Rewrite the intake message so history matches the final type
+        for message in reversed(state["conversation_history"]):
+            if message.sender == "intake_agent":
+                message.content = content
+                return
+
+        state["conversation_history"].append(Message(
+            timestamp=datetime.now().isoformat(),
+            sender="intake_agent",
+            content=content,
+            agent_type="intake",
+            confidence_score=0.8
+        ))
+
+    def _analysis_message_content(self, query_type: QueryType, urgency_level: UrgencyLevel,
+                                  sentiment_level: SentimentLevel) -> str:
+        """
+        Build the conversation history summary of an intake analysis
+        
+        Args:
+            query_type: Classified query type
+            urgency_level: Urgency level from the keyword scan
+            sentiment_level: Sentiment level of the query
+            
+        Returns:
+            str: Message content for the intake agent
+        """
+        return f"Query analyzed - Type: {query_type.value}, Urgency: {urgency_level.value}, Sentiment: {sentiment_level.value}"
+
+    def _analyze_states(self, states: List[SupportState], query_types: List[Any], urgency_levels: List[Any]) -> None:
+        """
+        Complete the analysis of classified states, scoring sentiment for
+        the whole batch at once
+        
+        Args:
+            states: Support states to analyze
+            query_types: Query type per state, None for states that failed
+            urgency_levels: Urgency level per state from the keyword scan
+        """
+
+        indices = [index for index, query_type in enumerate(query_types) if query_type is not None]
+        if not indices:
+            return
+
+        # One timestamp for every message written by this intake call
+        now_iso = datetime.now().isoformat()
+
+        try:
+            sentiment_levels, sentiment_scores = self.analyze_sentiment_batch(
+                [states[index]["original_query"] for index in indices]
+            )
+            sentiments = {
+                index: (sentiment_level, float(sentiment_score))
+                for index, sentiment_level, sentiment_score in zip(indices, sentiment_levels, sentiment_scores)
+            }
+        except Exception as e:
+            print(f"Batch sentiment analysis failed: {e}")
+            sentiments = {}
+
+        for index in indices:
+            self._analyze_state(states[index], query_types[index], urgency_levels[index], now_iso, sentiments.get(index))
+
+    def _analyze_state(self, state: SupportState, query_type: QueryType, urgency_level: UrgencyLevel, now_iso: str,
+                       sentiment: Optional[tuple[SentimentLevel, float]] = None) -> SupportState:
+        """
+        Complete the analysis of a single query and update its state
+        
+        Args:
+            state: Current support state
+            query_type: Already classified query type
+            urgency_level: Urgency level from the keyword scan
+            now_iso: ISO timestamp for messages written by this intake
+            sentiment: Optional precomputed (SentimentLevel, sentiment_score)
+            
         Returns:
             SupportState: Updated state with analysis
         """
@@ -170,9 +1106,7 @@ class IntakeAgent:
 
         try:
             # Analyze query components
-            query_type = self.analyze_query_type(query)
-            urgency_level = self.analyze_urgency(query)
-            sentiment_level, sentiment_score = self.analyze_sentiment(query)
+            sentiment_level, sentiment_score = sentiment or self.analyze_sentiment(query)
 
             # Update state with analysis
             state["query_type"] = query_type
@@ -192,17 +1126,16 @@ class IntakeAgent:
             }
 
             # Add intake agent to completed agents
-            state["completed_agents"].append("intake")
+            state["completed_agents"].add("intake")
 
             # Add analysis message to conversation history
-            analysis_message: Message = {
-                "timestamp": datetime.now().isoformat(),
-                "sender": "intake_agent",
-                "content": f"Query analyzed - Type: {query_type.value}, Urgency: {urgency_level.value}, Sentiment: {sentiment_level.value}",
-                "agent_type": "intake",
-                "confidence_score": 0.8
-            }
-            state["conversation_history"].append(analysis_message)
+            state["conversation_history"].append(Message(
+                timestamp=now_iso,
+                sender="intake_agent",
+                content=self._analysis_message_content(query_type, urgency_level, sentiment_level),
+                agent_type="intake",
+                confidence_score=0.8
+            ))
 
             print(f"✅ Analysis complete:")
             print(f"   Type: {query_type.value}")
@@ -210,16 +1143,26 @@ class IntakeAgent:
             print(f"   Sentiment: {sentiment_level.value} (score: {sentiment_score:.2f})")
 
         except Exception as e:
-            error_msg = f"Intake analysis failed: {str(e)}"
-            state["error_messages"].append(error_msg)
-            print(f"❌ {error_msg}")
-            
-            # Set defaults on error
-            state["query_type"] = QueryType.UNKNOWN
-            state["urgency_level"] = UrgencyLevel.MEDIUM
-            state["sentiment_level"] = SentimentLevel.NEUTRAL
+            self._record_error(state, e)
+
+        return state
+
+    def _record_error(self, state: SupportState, error: Exception) -> None:
+        """
+        Record an intake failure and fall back to default analysis values
+        
+        Args:
+            state: Current support state
+            error: Exception raised during analysis
+        """
+        error_msg = f"Intake analysis failed: {str(error)}"
+        state["error_messages"].append(error_msg)
+        print(f"❌ {error_msg}")
         
-    return state
+        # Set defaults on error
+        state["query_type"] = QueryType.UNKNOWN
+        state["urgency_level"] = UrgencyLevel.MEDIUM
+        state["sentiment_level"] = SentimentLevel.NEUTRAL
 
 # Create global instance
 intake_agent = IntakeAgent()
@@ -236,4 +1179,27 @@ def intake_node(state: SupportState) -> SupportState:
         SupportState: Updated state
     """
     return intake_agent.process_query(state)
-    
\ No newline at end of file
+
+async def aintake_node(state: SupportState) -> SupportState:
+    """
+    Async LangGraph node function for intake processing
+    
+    Args:
+        state: Current support state
+        
+    Returns:
+        SupportState: Updated state
+    """
+    return await intake_agent.aprocess_query(state)
+
+def intake_batch_node(states: List[SupportState]) -> List[SupportState]:
+    """
+    Batch entry point for intake processing
+    
+    Args:
+        states: Support states to analyze
+        
+    Returns:
+        list: Updated states
+    """
+    return intake_agent.process_queries(states)
@@ -5,37 +5,146 @@ Configuration settings for Customer Support Orchestrator
 from dotenv import load_dotenv
 from state import SupportConfig, get_default_config, UrgencyLevel
 import os
+import re
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
 
 # Load the env
 load_dotenv()
 
+# Environment variables and their defaults, read once at import
+_ENV_DEFAULTS = {
+    "OPENAI_API_KEY": None,
+    "MODEL_NAME": "gpt-4o-mini",
+    "CLASSIFICATION_TEMPERATURE": "0",
+    "MAX_TOKENS": "1500",
+    "MAX_CONCURRENCY": "10",
+    "LLM_BATCH_SIZE": "20",
+    "CLASSIFICATION_CACHE_SIZE": "10000",
+    "CLASSIFICATION_CACHE_TTL": "86400",
+    "REDIS_URL": None,
+    "REDIS_TIMEOUT": "0.5",
+    "ESCALATION_THRESHOLD_SENTIMENT": "-0.7",
+    "MAX_AUTO_REFUND": "100.0",
+    "CRITICAL_RESPONSE_TIME": "300",
+    "DATA_DIR": "./data",
+    "CUSTOMER_DB_PATH": None,
+    "LOG_LEVEL": "INFO"
+}
+_ENV = {key: os.environ.get(key, default) for key, default in _ENV_DEFAULTS.items()}
+
+
+def compile_keyword_pattern(keywords: list, whole_words: bool = False) -> re.Pattern:
+    """
+    Compile keywords into a single alternation regex
+    
+    By default the alternation sits inside a lookahead so findall() reports
+    a keyword at every position it occurs. Only one keyword can match at
+    each position, so keywords that are prefixes of one another ("bill",
+    "billing") are rejected; without them findall() agrees with plain
+    substring checks and with the keyword automaton.
+    
+    Args:
+        keywords: Keywords to match
+        whole_words: Only match keywords bounded by word boundaries
+        
+    Returns:
+        re.Pattern: Compiled pattern capturing the matched keyword
+        
+    Raises:
+        ValueError: If substring matching is requested for keywords that
+            are prefixes of other keywords
+    """
+    if not whole_words:
+        # In sorted order a keyword is followed by the keywords it prefixes
+        distinct = sorted(set(keywords))
+        overlapping = [
+            (shorter, longer) for shorter, longer in zip(distinct, distinct[1:]) if longer.startswith(shorter)
+        ]
+        if overlapping:
+            raise ValueError(f"Keywords overlap as prefixes: {overlapping}")
+
+    alternation = "|".join(map(re.escape, sorted(keywords, key=len, reverse=True)))
+    if whole_words:
+        return re.compile(rf"\b({alternation})\b")
+    return re.compile(f"(?=({alternation}))")
+
+
+def index_keywords(keyword_sets: dict) -> dict:
+    """
+    Map each keyword to every category that lists it
+    
+    Args:
+        keyword_sets: Keyword lists keyed by category
+        
+    Returns:
+        dict: Categories keyed by keyword
+    """
+    keyword_categories = {}
+    for category, keywords in keyword_sets.items():
+        for keyword in keywords:
+            keyword_categories.setdefault(keyword, []).append(category)
+    return keyword_categories
+
+
+def rank_keywords(keyword_sets: dict, order: tuple) -> dict:
+    """
+    Map each keyword to the highest priority of the categories that list it
+    
+    Args:
+        keyword_sets: Keyword lists keyed by category
+        order: Categories from highest to lowest priority
+        
+    Returns:
+        dict: Priority index into order keyed by keyword (0 is highest)
+    """
+    keyword_priority = {}
+    for category, keywords in keyword_sets.items():
+        priority = order.index(category)
+        for keyword in keywords:
+            keyword_priority[keyword] = min(priority, keyword_priority.get(keyword, priority))
+    return keyword_priority
+
+
 class Config:
     """Main configuration class"""
 
     # API keys
-    OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+    OPENAI_API_KEY = _ENV["OPENAI_API_KEY"]
 
     # LLM Settings
-    MODEL_NAME = os.getenv("MODEL_NAME", "gpt-4o-mini")
-    TEMPERATURE = float(os.getenv("TEMPERATURE", "0.1"))
-    MAX_TOKENS = int(os.getenv("MAX_TOKENS", "1500"))
+    MODEL_NAME = _ENV["MODEL_NAME"]
+    # Kept at 0 by default so cached classifications stay reproducible
+    CLASSIFICATION_TEMPERATURE = float(_ENV["CLASSIFICATION_TEMPERATURE"])
+    MAX_TOKENS = int(_ENV["MAX_TOKENS"])
+    MAX_CONCURRENCY = int(_ENV["MAX_CONCURRENCY"])
+    LLM_BATCH_SIZE = int(_ENV["LLM_BATCH_SIZE"])
+
+    # Classification Cache
+    CLASSIFICATION_CACHE_SIZE = int(_ENV["CLASSIFICATION_CACHE_SIZE"])
+    CLASSIFICATION_CACHE_TTL = int(_ENV["CLASSIFICATION_CACHE_TTL"])
+    REDIS_URL = _ENV["REDIS_URL"]
+    REDIS_TIMEOUT = float(_ENV["REDIS_TIMEOUT"])
 
     # Support System Settings
     SUPPORT_CONFIG = get_default_config()
 
-    # Override with env vairables if present
-    SUPPORT_CONFIG["sentiment_escalation_threshold"] = float(os.getenv(["ESCALATION_THRESHOLD_SENTIMENT", "-0.7"]))
-    SUPPORT_CONFIG["max_auto_refund"] = float(os.getenv("MAX_AUTO_REFUND", "100.0"))
-    SUPPORT_CONFIG["critical_response_time"] = int(os.getenv("CRITICAL_RESPONSE_TIME", "300"))
+    # Override with env variables if present
+    SUPPORT_CONFIG["sentiment_escalation_threshold"] = float(_ENV["ESCALATION_THRESHOLD_SENTIMENT"])
+    SUPPORT_CONFIG["max_auto_refund"] = float(_ENV["MAX_AUTO_REFUND"])
+    SUPPORT_CONFIG["critical_response_time"] = int(_ENV["CRITICAL_RESPONSE_TIME"])
 
     # FILE PATHS
-    DATA_DIR = os.getenv("DATA_DIR", "./data")
-    CUSTOMER_DB_PATH = os.getenv("CUSTOMER_DB_PATH", f"{DATA_DIR}/customer_data.json")
+    DATA_DIR = _ENV["DATA_DIR"]
+    CUSTOMER_DB_PATH = _ENV["CUSTOMER_DB_PATH"] or f"{DATA_DIR}/customer_data.json"
     ESCALATION_RULES_PATH = f"{DATA_DIR}/escalation_rules.json"
     RESPONSE_TEMPLATES_PATH = f"{DATA_DIR}/response_templates.json"
 
     # LOGGING
-    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+    LOG_LEVEL = _ENV["LOG_LEVEL"]
     LOG_DIR = "./outputs/logs"
 
     # Safety and Risk Assessment
@@ -47,6 +156,9 @@ class Config:
         "refund", "chargeback", "dispute"
     ]
 
+    # Urgency levels from highest to lowest priority
+    URGENCY_ORDER = (UrgencyLevel.CRITICAL, UrgencyLevel.HIGH, UrgencyLevel.MEDIUM, UrgencyLevel.LOW)
+
     URGENCY_KEYWORDS = {
         UrgencyLevel.CRITICAL: [
             "down", "outage", "emergency", "urgent", "immediately",
@@ -101,6 +213,17 @@ class Config:
         ]
     }
 
+    # Pre-compiled keyword matchers
+    SAFETY_PATTERN = compile_keyword_pattern(SAFETY_KEYWORDS, whole_words=True)
+    URGENCY_PATTERN = compile_keyword_pattern(
+        [keyword for keywords in URGENCY_KEYWORDS.values() for keyword in keywords]
+    )
+    URGENCY_KEYWORD_PRIORITY = rank_keywords(URGENCY_KEYWORDS, URGENCY_ORDER)
+    ROUTING_PATTERN = compile_keyword_pattern(
+        [keyword for keywords in ROUTING_KEYWORDS.values() for keyword in keywords]
+    )
+    ROUTING_KEYWORD_CATEGORIES = index_keywords(ROUTING_KEYWORDS)
+
     # Customer Tier Configurations
     TIER_SETTINGS = {
         "basic": {
@@ -160,6 +283,19 @@ class Config:
         """
         return cls.TIER_SETTINGS.get(tier.lower(), cls.TIER_SETTINGS["basic"])
 
+    @classmethod
+    def find_safety_keywords(cls, text: str) -> list:
+        """
+        Find safety-sensitive keywords in a piece of text
+        
+        Args:
+            text: Text to scan
+            
+        Returns:
+            list: Distinct safety keywords found, in order of appearance
+        """
+        return list(dict.fromkeys(cls.SAFETY_PATTERN.findall(text.lower())))
+
     @classmethod
     def should_auto_escalate(cls, tier: str, urgency: str, sentiment_score: float) -> bool:
         """
@@ -196,3 +332,40 @@ SAFETY_KEYWORDS = Config.SAFETY_KEYWORDS
 URGENCY_KEYWORDS = Config.URGENCY_KEYWORDS
 ROUTING_KEYWORDS = Config.ROUTING_KEYWORDS
 SENTIMENT_THRESHOLDS = Config.SENTIMENT_THRESHOLDS
+
+
+def build_keyword_automaton():
+    """
+    Compile routing and urgency keywords into a single Aho-Corasick automaton
+    
+    Each keyword maps to (keyword, tags, urgency_priority) where tags is a
+    tuple of (category, kind) pairs, kind is "routing" or "urgency", and
+    urgency_priority indexes Config.URGENCY_ORDER (len(URGENCY_ORDER) for
+    keywords that carry no urgency).
+    
+    Returns:
+        ahocorasick.Automaton: Compiled automaton, or None if pyahocorasick
+        is not installed
+    """
+    if ahocorasick is None:
+        return None
+
+    keyword_tags = {}
+    for query_type, keywords in ROUTING_KEYWORDS.items():
+        for keyword in keywords:
+            keyword_tags.setdefault(keyword, []).append((query_type, "routing"))
+    for urgency_level, keywords in URGENCY_KEYWORDS.items():
+        for keyword in keywords:
+            keyword_tags.setdefault(keyword, []).append((urgency_level, "urgency"))
+
+    no_urgency = len(Config.URGENCY_ORDER)
+    automaton = ahocorasick.Automaton()
+    for keyword, tags in keyword_tags.items():
+        urgency_priority = Config.URGENCY_KEYWORD_PRIORITY.get(keyword, no_urgency)
+        automaton.add_word(keyword, (keyword, tuple(tags), urgency_priority))
+    automaton.make_automaton()
+
+    return automaton
+
+
+KEYWORD_AUTOMATON = build_keyword_automaton()
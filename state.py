@@ -3,12 +3,17 @@ State schema for Customer Support Orchestrator
 This defines the data structure that flows through all agents
 """
 
-from typing import List, Dict, Optional
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, List, Dict, Optional, Set
 from typing_extensions import TypedDict
 from datetime import datetime
 from enum import Enum
 
-class QueryType():
+# Maximum number of messages kept in a session's conversation history
+MAX_CONVERSATION_HISTORY = 256
+
+class QueryType(str, Enum):
     """Type of customer queries"""
     TECHNICAL = "technical" 
     BILLING = "billing"
@@ -26,7 +31,7 @@ class UrgencyLevel(str, Enum):
 
 class SentimentLevel(str, Enum):
     """Customer Sentiment levels"""
-    VERY_HIGH = "very_high"
+    VERY_POSITIVE = "very_positive"
     POSITIVE = "positive"
     NEUTRAL = "neutral"
     NEGATIVE = "negative"
@@ -59,13 +64,14 @@ class AgentType(str, Enum):
     QUALITY = "quality"
     ESCALATION =  "escalation"
 
-class Message(TypedDict):
+@dataclass(slots=True)
+class Message:
     """Individual message in conversation"""
     timestamp: str
     sender: str     # customer, agent_name, human_agent
     content: str
-    agent_type: Optional[str]
-    confidence_score: Optional[str]
+    agent_type: Optional[str] = None
+    confidence_score: Optional[float] = None
 
 class CustomerInfo(TypedDict):
     """Customer Information"""
@@ -114,12 +120,12 @@ class SupportState(TypedDict):
     sentiment_level: SentimentLevel
 
     # Conversation History
-    conversation_history: List[Message]
+    conversation_history: Deque[Message]
 
     # Agent workflow
     current_agent: AgentType
     assigned_agents: List[AgentType]
-    completed_agents: List[AgentType]
+    completed_agents: Set[AgentType]
 
     # Agent Response
     agent_response: List[AgentResponse]
@@ -183,7 +189,9 @@ def create_initial_state(customer_id: str, query: str, customer_info: Optional[C
         SupportState: Initial state object
     """
 
-    session_id = f"support_{customer_id}_{int(datetime.now().timestamp())}"
+    now = datetime.now()
+    now_iso = now.isoformat()
+    session_id = f"support_{customer_id}_{int(now.timestamp())}"
 
     # Default customer info if not provided
     if customer_info is None:
@@ -200,7 +208,7 @@ def create_initial_state(customer_id: str, query: str, customer_info: Optional[C
     return {
         # Session information
         "session_id": session_id,
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": now_iso,
 
         # Customer Information
         "customer_info": customer_info,
@@ -213,20 +221,14 @@ def create_initial_state(customer_id: str, query: str, customer_info: Optional[C
         "sentiment_level": SentimentLevel.NEUTRAL,
 
         # Conversation History
-        "conversation_history": [
-            {
-                "timestamp": datetime.now().isoformat(),
-                "sender": "customer",
-                "content": query,
-                "agent_type": None,
-                "confidence_score": None
-            }
-        ],
+        "conversation_history": deque([
+            Message(timestamp=now_iso, sender="customer", content=query)
+        ], maxlen=MAX_CONVERSATION_HISTORY),
 
         # Agent Workflow
         "current_agent": AgentType.INTAKE,
         "assigned_agents": [],
-        "completed_agents": [],
+        "completed_agents": set(),
 
         # Agent Responses
         "agent_responses": [],
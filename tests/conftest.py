@@ -0,0 +1,4 @@
+import os
+
+# Tests never reach the OpenAI API, but its clients need a key to construct
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
@@ -0,0 +1,680 @@
+import asyncio
+import json
+import re
+import subprocess
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import agents.intake_agent as intake_module
+from agents.intake_agent import IntakeAgent, CLASSIFICATION_LINE_PATTERN, QUERY_TYPE_BY_VALUE, aintake_node
+from config import Config
+from state import QueryType, UrgencyLevel, create_initial_state
+
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+PROMPT_QUERY_LINE = re.compile(r'^\s*\[(\d+)\] "(.*)"$', re.MULTILINE)
+
+
+class StubResponse:
+    def __init__(self, content):
+        self.content = content
+
+
+class StubLLM:
+    """Answers classification prompts from a query -> label mapping"""
+
+    def __init__(self, labels=None, default="general", skip=()):
+        self.labels = labels or {}
+        self.default = default
+        self.skip = set(skip)
+        self.prompts = []
+
+    def respond(self, prompt):
+        self.prompts.append(prompt)
+        lines = [
+            f"[{index}] {self.labels.get(query, self.default)}"
+            for index, query in PROMPT_QUERY_LINE.findall(prompt)
+            if query not in self.skip
+        ]
+        return StubResponse("\n".join(lines))
+
+    def invoke(self, prompt):
+        return self.respond(prompt)
+
+    async def ainvoke(self, prompt):
+        return self.respond(prompt)
+
+    def queries_sent(self):
+        return [query for prompt in self.prompts for _, query in PROMPT_QUERY_LINE.findall(prompt)]
+
+
+class ReplyLLM:
+    """Answers every prompt with the same response text"""
+
+    def __init__(self, content):
+        self.content = content
+
+    def invoke(self, prompt):
+        return StubResponse(self.content)
+
+
+class FailingLLM:
+    def invoke(self, prompt):
+        raise RuntimeError("rate limited")
+
+    async def ainvoke(self, prompt):
+        raise RuntimeError("rate limited")
+
+
+class StubBatchClient:
+    """Minimal OpenAI client serving one Batch API job from memory"""
+
+    def __init__(self):
+        self.requests = []
+        self.retrieved = []
+        self.status = "in_progress"
+        self.output_file_id = None
+        self.output = ""
+        self.files = SimpleNamespace(create=self.create_file, content=self.file_content)
+        self.batches = SimpleNamespace(create=self.create_batch, retrieve=self.retrieve_batch)
+
+    def create_file(self, file, purpose):
+        _, data = file
+        self.requests = [json.loads(line) for line in data.decode("utf-8").splitlines()]
+        return SimpleNamespace(id="file-in")
+
+    def create_batch(self, input_file_id, endpoint, completion_window):
+        return SimpleNamespace(id="batch-1")
+
+    def retrieve_batch(self, batch_id):
+        self.retrieved.append(batch_id)
+        return SimpleNamespace(id=batch_id, status=self.status, output_file_id=self.output_file_id)
+
+    def file_content(self, file_id):
+        return SimpleNamespace(text=self.output)
+
+    def queries_sent(self):
+        return [
+            query
+            for request in self.requests
+            for _, query in PROMPT_QUERY_LINE.findall(request["body"]["messages"][0]["content"])
+        ]
+
+    def finish(self, labels, status="completed"):
+        """Answer the uploaded requests whose queries have a label"""
+        lines = []
+        for request in self.requests:
+            (_, query), = PROMPT_QUERY_LINE.findall(request["body"]["messages"][0]["content"])
+            if query not in labels:
+                continue
+            content = f"[1] {labels[query]}"
+            lines.append(json.dumps({
+                "custom_id": request["custom_id"],
+                "response": {"body": {"choices": [{"message": {"content": content}}]}}
+            }))
+
+        self.status = status
+        self.output_file_id = "file-out"
+        self.output = "\n".join(lines)
+
+
+class FakeRedis:
+    """In-memory stand-in for the redis-py calls the classification cache makes"""
+
+    def __init__(self):
+        self.values = {}
+        self.calls = []
+
+    def mget(self, keys):
+        self.calls.append("mget")
+        return [self.values.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def setex(self, key, ttl, value):
+        self.commands.append((key, value))
+
+    def execute(self):
+        self.redis.calls.append("execute")
+        for key, value in self.commands:
+            self.redis.values[key] = value.encode("utf-8")
+        self.commands = []
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    monkeypatch.setattr(Config, "REDIS_URL", None)
+    agent = IntakeAgent()
+    agent._llm = StubLLM()
+    return agent
+
+
+def make_states(queries):
+    return [create_initial_state(f"CUST{index:03d}", query) for index, query in enumerate(queries)]
+
+
+class TestLazyClients:
+    def test_import_skips_llm_libraries(self):
+        script = (
+            "import sys\n"
+            "import agents.intake_agent\n"
+            "print(sorted(name for name in ('langchain_openai', 'openai') if name in sys.modules))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", script], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        )
+
+        assert result.stdout.splitlines()[-1] == "[]"
+
+    def test_import_skips_scoring_kernel(self):
+        script = (
+            "import sys\n"
+            "import agents.intake_agent\n"
+            "print(sorted(name for name in ('numba', 'utils.keyword_scoring') if name in sys.modules))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", script], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        )
+
+        assert result.stdout.splitlines()[-1] == "[]"
+
+    def test_keyword_routing_never_builds_llm(self):
+        agent = IntakeAgent()
+        agent.process_queries(make_states(["The API returns an error", "I need a refund"]))
+
+        assert agent._llm is None
+        assert agent._client is None
+
+    def test_llm_built_once_on_first_use(self):
+        from langchain_openai import ChatOpenAI
+
+        agent = IntakeAgent()
+        llm = agent.llm
+
+        assert isinstance(llm, ChatOpenAI)
+        assert agent.llm is llm
+
+
+class TestClassificationParsing:
+    def test_line_pattern(self):
+        content = "[1] billing\n[2]technical\n  [10]   Sales  \nnot a line"
+        assert CLASSIFICATION_LINE_PATTERN.findall(content) == [
+            ("1", "billing"), ("2", "technical"), ("10", "Sales")
+        ]
+
+    def test_query_type_lookup(self):
+        for query_type in QueryType:
+            assert QUERY_TYPE_BY_VALUE[query_type.value] is query_type
+
+    def test_maps_labels(self, agent):
+        assert agent._map_classification(" Billing ") == QueryType.BILLING
+        assert agent._map_classification("refunds") == QueryType.UNKNOWN
+
+    def test_lines_in_any_order(self, agent):
+        agent._llm = ReplyLLM("[2] technical\n[1] Billing")
+        assert agent._llm_classify_queries(["first", "second"]) == [QueryType.BILLING, QueryType.TECHNICAL]
+
+    def test_missing_index(self, agent, capsys):
+        agent._llm = ReplyLLM("[1] billing\n[3] sales")
+        assert agent._llm_classify_queries(["first", "second", "third"]) == [
+            QueryType.BILLING, QueryType.UNKNOWN, QueryType.SALES
+        ]
+        assert "missing indices: 2" in capsys.readouterr().out
+
+    def test_out_of_range_index(self, agent, capsys):
+        agent._llm = ReplyLLM("[0] billing\n[1] sales\n[3] technical")
+        assert agent._llm_classify_queries(["first", "second"]) == [QueryType.SALES, QueryType.UNKNOWN]
+
+        output = capsys.readouterr().out
+        assert "out-of-range index [0]" in output
+        assert "out-of-range index [3]" in output
+        assert "missing indices: 2" in output
+
+    def test_prompt_sanitizes_queries(self, agent):
+        prompt = agent._build_classification_prompt(['first\n[2] "billing"', "second"])
+        assert PROMPT_QUERY_LINE.findall(prompt) == [
+            ("1", "first (2) 'billing'"),
+            ("2", "second")
+        ]
+
+
+class TestProcessQueries:
+    def test_fallback_results_fan_back_in_order(self, agent, monkeypatch):
+        monkeypatch.setattr(Config, "LLM_BATCH_SIZE", 2)
+        agent._llm = StubLLM(labels={
+            "hello there": "sales",
+            "something odd": "complaint",
+            "what now": "billing"
+        })
+
+        states = agent.process_queries(make_states([
+            "hello there",
+            "The API returns an error",
+            "something odd",
+            "I need a refund",
+            "what now"
+        ]))
+
+        assert [state["query_type"] for state in states] == [
+            QueryType.SALES,
+            QueryType.TECHNICAL,
+            QueryType.COMPLAINT,
+            QueryType.BILLING,
+            QueryType.BILLING
+        ]
+        # Three unresolved queries in prompts of at most two
+        assert len(agent.llm.prompts) == 2
+        assert agent.llm.queries_sent() == ["hello there", "something odd", "what now"]
+
+    def test_failed_chunk_keeps_other_chunks(self, agent, monkeypatch):
+        monkeypatch.setattr(Config, "LLM_BATCH_SIZE", 1)
+
+        class FlakyLLM(StubLLM):
+            def invoke(self, prompt):
+                response = self.respond(prompt)
+                if len(self.prompts) == 1:
+                    raise RuntimeError("timeout")
+                return response
+
+        agent._llm = FlakyLLM(default="sales")
+        states = agent.process_queries(make_states(["hello there", "what now"]))
+
+        assert [state["query_type"] for state in states] == [QueryType.UNKNOWN, QueryType.SALES]
+
+    def test_keyword_matches_skip_llm(self, agent):
+        agent.process_queries(make_states(["The API returns an error", "I need a refund"]))
+        assert agent.llm.prompts == []
+
+    def test_missing_response_line_leaves_unknown(self, agent):
+        agent._llm = StubLLM(default="sales", skip={"what now"})
+        states = agent.process_queries(make_states(["hello there", "what now"]))
+
+        assert [state["query_type"] for state in states] == [QueryType.SALES, QueryType.UNKNOWN]
+
+    def test_llm_failure_leaves_unknown(self, agent):
+        agent._llm = FailingLLM()
+        states = agent.process_queries(make_states(["hello there", "I need a refund"]))
+
+        assert [state["query_type"] for state in states] == [QueryType.UNKNOWN, QueryType.BILLING]
+
+    def test_mixed_case_query(self, agent):
+        states = agent.process_queries(make_states(["URGENT: The API is DOWN", "Hello There"]))
+
+        assert states[0]["query_type"] == QueryType.TECHNICAL
+        assert states[0]["urgency_level"] == UrgencyLevel.CRITICAL
+        assert states[0]["processed_query"] == "URGENT: The API is DOWN"
+        # The LLM sees the original casing
+        assert agent.llm.queries_sent() == ["Hello There"]
+
+    def test_process_query_wraps_batch(self, agent):
+        agent._llm = StubLLM(default="complaint")
+        state = agent.process_query(create_initial_state("CUST001", "hello there"))
+
+        assert state["query_type"] == QueryType.COMPLAINT
+        assert state["debug_info"]["intake_analysis"]["query_type"] == "complaint"
+        assert state["current_agent"] == "router"
+
+
+class TestAsyncIntake:
+    def test_async_matches_sync(self, agent):
+        queries = ["hello there", "The API returns an error", "what now"]
+        agent._llm = StubLLM(labels={"hello there": "sales"}, default="complaint")
+
+        sync_states = agent.process_queries(make_states(queries))
+        agent.classification_cache.clear()
+        async_states = asyncio.run(agent.aprocess_queries(make_states(queries)))
+
+        assert [state["query_type"] for state in async_states] == [state["query_type"] for state in sync_states]
+        assert [state["urgency_level"] for state in async_states] == [state["urgency_level"] for state in sync_states]
+        assert len(agent.llm.prompts) == 2
+
+    def test_async_llm_failure_leaves_unknown(self, agent):
+        agent._llm = FailingLLM()
+        state = asyncio.run(agent.aprocess_query(create_initial_state("CUST001", "hello there")))
+
+        assert state["query_type"] == QueryType.UNKNOWN
+
+    def test_concurrent_intakes(self, agent, monkeypatch):
+        monkeypatch.setattr(intake_module, "intake_agent", agent)
+        agent._llm = StubLLM(default="sales")
+
+        async def run_intakes():
+            return await asyncio.gather(*(
+                aintake_node(create_initial_state(f"CUST{index:03d}", f"something odd {index}"))
+                for index in range(5)
+            ))
+
+        states = asyncio.run(run_intakes())
+
+        assert [state["query_type"] for state in states] == [QueryType.SALES] * 5
+        assert sorted(agent.llm.queries_sent()) == [f"something odd {index}" for index in range(5)]
+
+
+    def test_across_event_loops(self, agent):
+        # The concurrency semaphore must not stay bound to the first loop
+        for _ in range(2):
+            state = asyncio.run(agent.aprocess_query(create_initial_state("CUST001", "hello there")))
+            assert state["query_type"] == QueryType.GENERAL
+            agent.classification_cache.clear()
+
+    def test_chunks_run_concurrently_up_to_limit(self, agent, monkeypatch):
+        monkeypatch.setattr(Config, "LLM_BATCH_SIZE", 1)
+        monkeypatch.setattr(Config, "MAX_CONCURRENCY", 2)
+
+        class SlowLLM(StubLLM):
+            in_flight = 0
+            peak = 0
+
+            async def ainvoke(self, prompt):
+                SlowLLM.in_flight += 1
+                SlowLLM.peak = max(SlowLLM.peak, SlowLLM.in_flight)
+                await asyncio.sleep(0.01)
+                SlowLLM.in_flight -= 1
+                return self.respond(prompt)
+
+        agent._llm = SlowLLM(default="sales")
+        queries = [f"something odd {index}" for index in range(4)]
+
+        assert asyncio.run(agent._allm_classify_queries(queries)) == [QueryType.SALES] * 4
+        assert SlowLLM.peak == 2
+
+    def test_no_worker_thread_without_redis(self, agent, monkeypatch):
+        async def unexpected_to_thread(*args, **kwargs):
+            raise AssertionError("to_thread called without Redis")
+
+        monkeypatch.setattr(intake_module.asyncio, "to_thread", unexpected_to_thread)
+        state = asyncio.run(agent.aprocess_query(create_initial_state("CUST001", "hello there")))
+
+        assert state["query_type"] == QueryType.GENERAL
+
+    def test_async_reads_redis(self, agent):
+        agent.redis = FakeRedis()
+        agent._llm = StubLLM(default="billing")
+        agent._llm_classify_queries(["hello there"])
+        agent.classification_cache.clear()
+
+        agent._llm = FailingLLM()
+        state = asyncio.run(agent.aprocess_query(create_initial_state("CUST001", "hello there")))
+
+        assert state["query_type"] == QueryType.BILLING
+        assert agent.redis.calls == ["mget", "execute", "mget"]
+
+
+class TestClassificationCache:
+    def test_cached_results_skip_llm(self, agent):
+        agent._llm_classify_queries(["hello there"])
+        agent._llm_classify_queries(["HELLO THERE"])
+
+        assert len(agent.llm.prompts) == 1
+
+    def test_duplicate_queries_sent_once(self, agent):
+        agent._llm = StubLLM(default="sales")
+        states = agent.process_queries(make_states(["hello there", "Hello there ", "hello there"]))
+
+        assert [state["query_type"] for state in states] == [QueryType.SALES] * 3
+        assert agent.llm.queries_sent() == ["hello there"]
+
+    def test_lru_eviction(self, agent, monkeypatch):
+        monkeypatch.setattr(Config, "CLASSIFICATION_CACHE_SIZE", 2)
+
+        agent._llm_classify_queries(["first"])
+        agent._llm_classify_queries(["second"])
+        # Touch "first" so "second" is the least recently used
+        agent._llm_classify_queries(["first"])
+        agent._llm_classify_queries(["third"])
+
+        assert len(agent.classification_cache) == 2
+        assert agent.llm.queries_sent() == ["first", "second", "third"]
+
+        agent._llm_classify_queries(["first", "second"])
+        assert agent.llm.queries_sent()[3:] == ["second"]
+
+    def test_unknown_not_cached(self, agent):
+        agent._llm = StubLLM(default="nonsense")
+
+        assert agent._llm_classify_queries(["hello there"]) == [QueryType.UNKNOWN]
+        assert agent.classification_cache == {}
+
+        agent._llm_classify_queries(["hello there"])
+        assert len(agent.llm.prompts) == 2
+
+    def test_shared_through_redis(self, agent):
+        agent.redis = FakeRedis()
+        agent._llm = StubLLM(default="billing")
+        agent._llm_classify_queries(["hello there"])
+
+        other = IntakeAgent()
+        other.redis = agent.redis
+        other._llm = FailingLLM()
+
+        assert other._llm_classify_queries(["hello there"]) == [QueryType.BILLING]
+        assert len(other.classification_cache) == 1
+
+    def test_one_redis_round_trip_per_lookup(self, agent):
+        agent.redis = FakeRedis()
+        agent._llm = StubLLM(default="billing")
+
+        agent._llm_classify_queries(["first", "second", "third"])
+        assert agent.redis.calls == ["mget", "execute"]
+        assert len(agent.redis.values) == 3
+
+        agent.classification_cache.clear()
+        agent.redis.calls.clear()
+        agent._llm_classify_queries(["first", "second", "third"])
+        assert agent.redis.calls == ["mget"]
+        assert len(agent.llm.prompts) == 1
+
+
+class TestBatchAPI:
+    @pytest.fixture(autouse=True)
+    def parallel_processing(self, monkeypatch):
+        monkeypatch.setitem(Config.SUPPORT_CONFIG, "enable_parallel_processing", True)
+
+    def test_submit_uploads_unresolved_queries(self, agent):
+        agent._client = StubBatchClient()
+        states = make_states(["hello there", "I need a refund", "what now"])
+
+        assert agent.submit_batch(states) == "batch-1"
+        assert agent.client.queries_sent() == ["hello there", "what now"]
+        assert agent.llm.prompts == []
+
+        # Keyword-resolved states are analyzed immediately
+        assert states[1]["query_type"] == QueryType.BILLING
+
+    def test_submit_without_fallback(self, agent):
+        agent._client = StubBatchClient()
+
+        assert agent.submit_batch(make_states(["I need a refund"])) is None
+        assert agent.client.requests == []
+
+    def test_collect_waits_for_batch(self, agent):
+        agent._client = StubBatchClient()
+        batch_id = agent.submit_batch(make_states(["hello there"]))
+
+        assert agent.collect_batch(batch_id) is None
+
+    def test_collect_updates_states(self, agent):
+        agent._client = StubBatchClient()
+        states = make_states(["hello there", "I need a refund", "what now"])
+        batch_id = agent.submit_batch(states)
+
+        agent.client.finish({"hello there": "sales", "what now": "complaint"})
+        collected = agent.collect_batch(batch_id)
+
+        assert [state["session_id"] for state in collected] == [states[0]["session_id"], states[2]["session_id"]]
+        assert [state["query_type"] for state in states] == [QueryType.SALES, QueryType.BILLING, QueryType.COMPLAINT]
+        assert states[0]["debug_info"]["intake_analysis"]["query_type"] == "sales"
+
+    def test_requests_use_classification_temperature(self, agent, monkeypatch):
+        monkeypatch.setattr(Config, "CLASSIFICATION_TEMPERATURE", 0.3)
+        agent._client = StubBatchClient()
+        agent.submit_batch(make_states(["hello there"]))
+
+        assert [request["body"]["temperature"] for request in agent.client.requests] == [0.3]
+
+    def test_states_sharing_a_session_get_distinct_results(self, agent):
+        agent._client = StubBatchClient()
+        states = make_states(["hello there", "what now"])
+        states[1]["session_id"] = states[0]["session_id"]
+        batch_id = agent.submit_batch(states)
+
+        custom_ids = [request["custom_id"] for request in agent.client.requests]
+        assert len(set(custom_ids)) == 2
+
+        agent.client.finish({"hello there": "sales", "what now": "complaint"})
+        agent.collect_batch(batch_id)
+
+        assert [state["query_type"] for state in states] == [QueryType.SALES, QueryType.COMPLAINT]
+
+    def test_submit_skips_cached_queries(self, agent):
+        agent._llm_classify_queries(["hello there"])
+        agent._client = StubBatchClient()
+        states = make_states(["hello there", "what now"])
+
+        agent.submit_batch(states)
+
+        assert agent.client.queries_sent() == ["what now"]
+        assert states[0]["query_type"] == QueryType.GENERAL
+
+    def test_duplicate_queries_uploaded_once(self, agent):
+        agent._client = StubBatchClient()
+        states = make_states(["hello there", "what now", "Hello there "])
+        batch_id = agent.submit_batch(states)
+
+        assert agent.client.queries_sent() == ["hello there", "what now"]
+
+        agent.client.finish({"hello there": "sales", "what now": "complaint"})
+        collected = agent.collect_batch(batch_id)
+
+        assert len(collected) == 3
+        assert [state["query_type"] for state in states] == [QueryType.SALES, QueryType.COMPLAINT, QueryType.SALES]
+
+    def test_collect_updates_history(self, agent):
+        agent._client = StubBatchClient()
+        state = create_initial_state("CUST001", "hello there")
+        batch_id = agent.submit_batch([state])
+
+        agent.client.finish({"hello there": "sales"})
+        agent.collect_batch(batch_id)
+
+        intake_messages = [message for message in state["conversation_history"] if message.sender == "intake_agent"]
+        assert len(intake_messages) == 1
+        assert intake_messages[0].content.startswith("Query analyzed - Type: sales,")
+
+    def test_collect_waits_while_cancelling(self, agent):
+        agent._client = StubBatchClient()
+        batch_id = agent.submit_batch(make_states(["hello there"]))
+        agent.client.status = "cancelling"
+
+        assert agent.collect_batch(batch_id) is None
+        assert batch_id in agent.pending_batches
+
+    @pytest.mark.parametrize("status", ["expired", "cancelled"])
+    def test_collect_keeps_partial_results(self, agent, status):
+        agent._client = StubBatchClient()
+        states = make_states(["hello there", "what now"])
+        batch_id = agent.submit_batch(states)
+
+        agent.client.finish({"hello there": "sales"}, status=status)
+        collected = agent.collect_batch(batch_id)
+
+        assert len(collected) == 2
+        assert [state["query_type"] for state in states] == [QueryType.SALES, QueryType.UNKNOWN]
+
+    def test_collect_without_output_returns_states(self, agent):
+        agent._client = StubBatchClient()
+        states = make_states(["hello there"])
+        batch_id = agent.submit_batch(states)
+        agent.client.status = "failed"
+
+        assert agent.collect_batch(batch_id) == states
+        assert states[0]["query_type"] == QueryType.UNKNOWN
+
+    def test_collect_unknown_batch(self, agent, capsys):
+        agent._client = StubBatchClient()
+
+        assert agent.collect_batch("batch-unknown") == []
+        assert agent.client.retrieved == []
+        assert "Unknown batch batch-unknown" in capsys.readouterr().out
+
+    def test_submit_falls_back_when_parallel_disabled(self, agent, monkeypatch):
+        monkeypatch.setitem(Config.SUPPORT_CONFIG, "enable_parallel_processing", False)
+        agent._client = StubBatchClient()
+        agent._llm = StubLLM(default="sales")
+        states = make_states(["hello there"])
+
+        assert agent.submit_batch(states) is None
+        assert agent.client.requests == []
+        assert states[0]["query_type"] == QueryType.SALES
+
+
+class TestCorpusAnalysis:
+    QUERIES = [
+        "Production is down, the API returns an error",
+        "I need a refund for this charge",
+        "hello there",
+        "Thanks, can I get a demo of the enterprise plan?",
+    ]
+
+    @pytest.fixture(autouse=True)
+    def pandas(self):
+        pytest.importorskip("pandas")
+
+    def test_matches_process_queries(self, agent):
+        corpus = agent.analyze_corpus(np.array(self.QUERIES, dtype=object))
+        states = agent.process_queries(make_states(self.QUERIES))
+
+        assert corpus["query"].tolist() == self.QUERIES
+        assert corpus["urgency_level"].tolist() == [state["urgency_level"] for state in states]
+        assert corpus["sentiment_level"].tolist() == [state["sentiment_level"] for state in states]
+        assert corpus["sentiment_score"].tolist() == [state["debug_info"]["sentiment_score"] for state in states]
+        assert corpus["query_type"].tolist() == [
+            QueryType.TECHNICAL, QueryType.BILLING, QueryType.UNKNOWN, QueryType.SALES
+        ]
+
+    def test_unmatched_rows_stay_unknown_without_fallback(self, agent):
+        corpus = agent.analyze_corpus(np.array(["hello there", "what now"], dtype=object))
+
+        assert corpus["query_type"].tolist() == [QueryType.UNKNOWN, QueryType.UNKNOWN]
+        assert agent.llm.prompts == []
+
+    def test_llm_fallback(self, agent):
+        agent._llm = StubLLM(labels={"hello there": "sales"}, default="complaint")
+        corpus = agent.analyze_corpus(np.array(self.QUERIES, dtype=object), llm_fallback=True)
+
+        assert corpus["query_type"].tolist() == [
+            QueryType.TECHNICAL, QueryType.BILLING, QueryType.SALES, QueryType.SALES
+        ]
+        assert agent.llm.queries_sent() == ["hello there"]
+
+    def test_llm_fallback_reports_leftover_unknowns(self, agent, monkeypatch, capsys):
+        monkeypatch.setattr(Config, "LLM_BATCH_SIZE", 1)
+        agent._llm = StubLLM(labels={"hello there": "sales"}, default="nonsense")
+        corpus = agent.analyze_corpus(np.array(["hello there", "what now"], dtype=object), llm_fallback=True)
+
+        assert corpus["query_type"].tolist() == [QueryType.SALES, QueryType.UNKNOWN]
+        assert len(agent.llm.prompts) == 2
+        assert "1 of 2 unmatched queries left UNKNOWN" in capsys.readouterr().out
+
+    def test_keeps_full_query_text(self, agent):
+        queries = ["hi", "I need a refund for this charge"]
+        corpus = agent.analyze_corpus(queries)
+
+        assert corpus["query"].tolist() == queries
+        assert corpus["query_type"].tolist() == [QueryType.UNKNOWN, QueryType.BILLING]
+
+    def test_rejects_non_string_queries(self, agent):
+        with pytest.raises(TypeError):
+            agent.analyze_corpus(np.array(["I need a refund", None], dtype=object))
@@ -0,0 +1,100 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from config import Config, _ENV_DEFAULTS, compile_keyword_pattern, rank_keywords
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def load_config_values(**env):
+    """Import config in a fresh interpreter with only the given settings set"""
+    script = (
+        "import json\n"
+        "from config import Config\n"
+        "print(json.dumps({\n"
+        "    'sentiment_escalation_threshold': Config.SUPPORT_CONFIG['sentiment_escalation_threshold'],\n"
+        "    'max_concurrency': Config.MAX_CONCURRENCY,\n"
+        "    'classification_temperature': Config.CLASSIFICATION_TEMPERATURE,\n"
+        "    'customer_db_path': Config.CUSTOMER_DB_PATH,\n"
+        "    'redis_url': Config.REDIS_URL\n"
+        "}))"
+    )
+    base_env = {key: value for key, value in os.environ.items() if key not in _ENV_DEFAULTS}
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=REPO_ROOT, env={**base_env, **env}, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def test_compile_keyword_pattern_reports_every_occurrence():
+    pattern = compile_keyword_pattern(["refund", "bill"])
+    assert pattern.findall("bill me, then refund the bill") == ["bill", "refund", "bill"]
+
+
+def test_compile_keyword_pattern_escapes_keywords():
+    pattern = compile_keyword_pattern(["c++", "a.b"])
+    assert pattern.findall("c++ and axb") == ["c++"]
+
+
+def test_compile_keyword_pattern_rejects_prefix_overlaps():
+    with pytest.raises(ValueError, match="bill"):
+        compile_keyword_pattern(["refund", "bill", "billing"])
+
+
+def test_compile_keyword_pattern_allows_prefix_overlaps_for_whole_words():
+    pattern = compile_keyword_pattern(["bill", "billing"], whole_words=True)
+    assert pattern.findall("billing for the bill") == ["billing", "bill"]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("I will SUE you and call my lawyer", ["sue", "lawyer"]),
+    ("Refund me or I file a chargeback. I want a refund!", ["refund", "chargeback"]),
+    ("Please delete account data after the data breach", ["delete account", "data breach"]),
+    ("How do I change my password?", []),
+    ("I have an issue with my invoice", []),
+    ("Thanks for the courtesy call", []),
+])
+def test_find_safety_keywords(text, expected):
+    assert Config.find_safety_keywords(text) == expected
+
+
+def test_rank_keywords_keeps_highest_priority():
+    keyword_sets = {"low": ["help", "soon"], "high": ["help", "now"]}
+    assert rank_keywords(keyword_sets, ("high", "low")) == {"help": 0, "soon": 1, "now": 0}
+
+
+def test_urgency_keyword_priority_follows_urgency_order():
+    for priority, urgency_level in enumerate(Config.URGENCY_ORDER):
+        for keyword in Config.URGENCY_KEYWORDS[urgency_level]:
+            assert Config.URGENCY_KEYWORD_PRIORITY[keyword] <= priority
+
+
+def test_env_defaults():
+    assert load_config_values() == {
+        "sentiment_escalation_threshold": -0.7,
+        "max_concurrency": 10,
+        "classification_temperature": 0.0,
+        "customer_db_path": "./data/customer_data.json",
+        "redis_url": None
+    }
+
+
+def test_env_overrides():
+    values = load_config_values(
+        ESCALATION_THRESHOLD_SENTIMENT="-0.4",
+        MAX_CONCURRENCY="4",
+        CLASSIFICATION_TEMPERATURE="0.2",
+        DATA_DIR="/srv/support"
+    )
+
+    assert values["sentiment_escalation_threshold"] == -0.4
+    assert values["max_concurrency"] == 4
+    assert values["classification_temperature"] == 0.2
+    assert values["customer_db_path"] == "/srv/support/customer_data.json"
@@ -0,0 +1,75 @@
+from collections import deque
+
+import pytest
+
+from agents.intake_agent import IntakeAgent
+from state import MAX_CONVERSATION_HISTORY, Message, create_initial_state
+
+
+def test_initial_state_collections():
+    state = create_initial_state("CUST001", "The API returns an error")
+
+    assert state["completed_agents"] == set()
+    assert isinstance(state["conversation_history"], deque)
+    assert state["conversation_history"].maxlen == MAX_CONVERSATION_HISTORY
+    assert len(state["conversation_history"]) == 1
+
+
+def test_conversation_history_is_bounded():
+    state = create_initial_state("CUST001", "The API returns an error")
+    first_message = state["conversation_history"][0]
+
+    for _ in range(MAX_CONVERSATION_HISTORY):
+        state["conversation_history"].append(first_message)
+
+    assert len(state["conversation_history"]) == MAX_CONVERSATION_HISTORY
+
+
+def test_intake_completes_once():
+    agent = IntakeAgent()
+    state = create_initial_state("CUST001", "The API returns an error")
+
+    agent.process_query(state)
+    agent.process_query(state)
+
+    assert state["completed_agents"] == {"intake"}
+    assert len(state["conversation_history"]) == 3
+
+
+def test_message_is_slotted():
+    message = Message(timestamp="2024-01-01T00:00:00", sender="customer", content="hi")
+
+    assert message.agent_type is None
+    assert message.confidence_score is None
+    assert not hasattr(message, "__dict__")
+    with pytest.raises(AttributeError):
+        message.extra = "value"
+
+
+def test_history_holds_messages():
+    agent = IntakeAgent()
+    state = agent.process_query(create_initial_state("CUST001", "The API returns an error"))
+
+    customer_message, intake_message = state["conversation_history"]
+    assert customer_message == Message(
+        timestamp=customer_message.timestamp, sender="customer", content="The API returns an error"
+    )
+    assert intake_message.sender == "intake_agent"
+    assert intake_message.agent_type == "intake"
+    assert intake_message.content.startswith("Query analyzed - Type: technical")
+
+
+def test_initial_state_uses_one_timestamp():
+    state = create_initial_state("CUST001", "The API returns an error")
+
+    assert state["conversation_history"][0].timestamp == state["timestamp"]
+    assert state["session_id"].startswith("support_CUST001_")
+
+
+def test_intake_call_uses_one_timestamp():
+    agent = IntakeAgent()
+    states = agent.process_queries([
+        create_initial_state(f"CUST{index:03d}", "The API returns an error") for index in range(3)
+    ])
+
+    assert len({state["conversation_history"][-1].timestamp for state in states}) == 1
@@ -0,0 +1,87 @@
+import pytest
+
+from agents.intake_agent import IntakeAgent, VADER_ANALYZER
+from config import SENTIMENT_THRESHOLDS
+from state import SentimentLevel
+
+
+EPSILON = 1e-9
+
+
+class FixedScoreAnalyzer:
+    """Returns the query text itself as the compound score"""
+
+    def polarity_scores(self, query):
+        return {"compound": float(query)}
+
+
+@pytest.fixture
+def agent():
+    return IntakeAgent()
+
+
+@pytest.fixture
+def fixed_scores(agent):
+    agent.sentiment_analyzer = FixedScoreAnalyzer()
+
+
+def boundary_scores():
+    scores = [-1.0, 0.0, 1.0]
+    for name in ("very_negative", "negative", "neutral", "positive", "very_positive"):
+        threshold = SENTIMENT_THRESHOLDS[name]
+        scores.extend([threshold - EPSILON, threshold, threshold + EPSILON])
+    return scores
+
+
+@pytest.mark.parametrize("score, expected", [
+    (0.5, SentimentLevel.VERY_POSITIVE),
+    (0.1, SentimentLevel.POSITIVE),
+    (-0.1, SentimentLevel.NEUTRAL),
+    (-0.5, SentimentLevel.NEGATIVE),
+    (-0.7, SentimentLevel.VERY_NEGATIVE),
+    (-0.7 - EPSILON, SentimentLevel.ANGRY),
+])
+def test_thresholds_are_inclusive(agent, fixed_scores, score, expected):
+    assert agent.analyze_sentiment(repr(score)) == (expected, score)
+
+
+def test_batch_matches_cascade_at_boundaries(agent, fixed_scores):
+    queries = [repr(score) for score in boundary_scores()]
+
+    levels, scores = agent.analyze_sentiment_batch(queries)
+
+    assert levels == [agent.analyze_sentiment(query)[0] for query in queries]
+    assert scores.tolist() == boundary_scores()
+
+
+def test_batch_matches_cascade(agent):
+    queries = [
+        "This is absolutely unacceptable, I am furious!",
+        "The app keeps crashing and it's annoying",
+        "How do I change my password?",
+        "Thanks, that fixed it",
+        "You are amazing, best support ever!!!",
+    ]
+
+    levels, scores = agent.analyze_sentiment_batch(queries)
+
+    assert list(zip(levels, scores.tolist())) == [agent.analyze_sentiment(query) for query in queries]
+
+
+def test_agents_share_vader_analyzer():
+    assert IntakeAgent().sentiment_analyzer is VADER_ANALYZER
+    assert IntakeAgent().sentiment_analyzer is VADER_ANALYZER
+
+
+def test_score_is_vader_compound(agent):
+    query = "Thanks, that fixed it"
+    compound = agent.sentiment_analyzer.polarity_scores(query)["compound"]
+
+    assert agent.analyze_sentiment(query)[1] == compound
+    assert agent.analyze_sentiment_batch([query])[1].tolist() == [compound]
+
+
+def test_empty_batch(agent):
+    levels, scores = agent.analyze_sentiment_batch([])
+    assert levels == []
+    assert len(scores) == 0
@@ -0,0 +1,137 @@
+import numpy as np
+import pytest
+
+import agents.intake_agent as intake_module
+from agents.intake_agent import IntakeAgent
+from config import Config
+from state import UrgencyLevel
+
+
+QUERIES = [
+    "Production is down and I need help immediately",
+    "quick question about my invoice",
+    "just curious about the enterprise plan sometime",
+    "hello",
+    "The API is not working, error 500 on every webhook",
+    "I was wondering how to reset my password",
+    "urgent urgent urgent: payment broken",
+    "whenever I login the settings page is broken",
+    "Can I buy a custom contract? basic pricing details please",
+    "issue with my credit card transaction, bank says no charge",
+]
+
+
+@pytest.fixture
+def agent():
+    return IntakeAgent()
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("Production is down", UrgencyLevel.CRITICAL),
+    ("quick question", UrgencyLevel.HIGH),
+    ("where is the documentation", UrgencyLevel.MEDIUM),
+    ("just curious", UrgencyLevel.LOW),
+    ("hello", UrgencyLevel.MEDIUM),
+])
+def test_analyze_urgency(agent, query, expected):
+    assert agent.analyze_urgency(query.lower()) == expected
+
+
+@pytest.mark.parametrize("query", [
+    "just curious, but this is urgent",
+    "this is urgent, just curious",
+])
+def test_highest_priority_wins_regardless_of_position(agent, monkeypatch, query):
+    assert agent.analyze_urgency(query) == UrgencyLevel.CRITICAL
+
+    monkeypatch.setattr(intake_module, "KEYWORD_AUTOMATON", None)
+    assert agent.analyze_urgency(query) == UrgencyLevel.CRITICAL
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_fallback_pattern_matches_keyword_lists(agent, monkeypatch, query):
+    monkeypatch.setattr(intake_module, "KEYWORD_AUTOMATON", None)
+    query_lower = query.lower()
+
+    expected = UrgencyLevel.MEDIUM
+    for urgency_level, keywords in Config.URGENCY_KEYWORDS.items():
+        if any(keyword in query_lower for keyword in keywords):
+            expected = urgency_level
+            break
+
+    assert agent.analyze_urgency(query_lower) == expected
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_automaton_matches_fallback_scan(agent, monkeypatch, query):
+    pytest.importorskip("ahocorasick")
+    from config import build_keyword_automaton
+
+    query_lower = query.lower()
+
+    monkeypatch.setattr(intake_module, "KEYWORD_AUTOMATON", None)
+    fallback_result = agent._scan_keywords(query_lower)
+
+    monkeypatch.setattr(intake_module, "KEYWORD_AUTOMATON", build_keyword_automaton())
+    automaton_result = agent._scan_keywords(query_lower)
+
+    assert automaton_result == fallback_result
+
+
+@pytest.mark.parametrize("use_automaton", [True, False])
+def test_top_priority_keeps_later_routing_matches(agent, monkeypatch, use_automaton):
+    if use_automaton:
+        pytest.importorskip("ahocorasick")
+        from config import build_keyword_automaton
+        monkeypatch.setattr(intake_module, "KEYWORD_AUTOMATON", build_keyword_automaton())
+    else:
+        monkeypatch.setattr(intake_module, "KEYWORD_AUTOMATON", None)
+
+    type_scores, best_priority = agent._scan_keywords("urgent: refund the charge on my invoice")
+
+    assert best_priority == 0
+    assert type_scores["billing"] == 3
+
+
+def test_repeated_keyword_counts_once(agent):
+    type_scores, _ = agent._scan_keywords("refund refund refund")
+    assert type_scores["billing"] == 1
+
+
+def test_batch_scoring_matches_single_query_scan(agent):
+    queries_lower = [query.lower() for query in QUERIES]
+    type_scores, urgency_priorities = agent.score_keywords_batch(queries_lower)
+
+    for row, query_lower in enumerate(queries_lower):
+        scan_scores, scan_priority = agent._scan_keywords(query_lower)
+        assert dict(zip(intake_module.SCORING_CATEGORIES, type_scores[row].tolist())) == scan_scores
+        assert urgency_priorities[row] == scan_priority
+
+
+def test_no_urgency_keyword_priority(agent):
+    _, best_priority = agent._scan_keywords("hello")
+    assert best_priority == len(Config.URGENCY_ORDER)
+
+
+def test_batch_scoring_numpy_fallback_matches_kernel():
+    from utils import keyword_scoring
+
+    queries_lower = [query.lower() for query in QUERIES]
+    row_offsets, keyword_ids = [0], []
+    for query_lower in queries_lower:
+        keyword_ids.extend(intake_module.SCORING_KEYWORD_IDS[keyword]
+                           for keyword in set(intake_module.SCORING_PATTERN.findall(query_lower)))
+        row_offsets.append(len(keyword_ids))
+
+    args = (
+        np.array(row_offsets, dtype=np.int64),
+        np.array(keyword_ids, dtype=np.int64),
+        intake_module.KEYWORD_CATEGORY_TABLE,
+        intake_module.KEYWORD_URGENCY_TABLE,
+        len(Config.URGENCY_ORDER)
+    )
+    loop_scores, loop_priorities = keyword_scoring._score_keyword_rows_loop(*args)
+    numpy_scores, numpy_priorities = keyword_scoring._score_keyword_rows_numpy(*args)
+
+    assert (loop_scores == numpy_scores).all()
+    assert (loop_priorities == numpy_priorities).all()
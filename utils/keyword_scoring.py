@@ -0,0 +1,66 @@
+"""
+Bulk keyword scoring kernels for offline re-analysis of historic tickets
+
+Kept out of the intake agent so that importing Numba and loading its
+compiled kernel only happens when bulk scoring is actually used.
+"""
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+    prange = range
+
+
+def _score_keyword_rows_loop(row_offsets, keyword_ids, category_table, urgency_table, no_urgency):
+    """
+    Score rows of matched keyword IDs, one row per query
+    
+    Args:
+        row_offsets: Start of each row in keyword_ids, plus the final end
+        keyword_ids: Distinct matched keyword IDs for all rows, concatenated
+        category_table: Category membership per keyword ID
+        urgency_table: Urgency priority per keyword ID
+        no_urgency: Priority used for rows with no urgency keyword
+        
+    Returns:
+        tuple: (type scores per row and category, best urgency priority per row)
+    """
+    n_rows = row_offsets.shape[0] - 1
+    n_categories = category_table.shape[1]
+    type_scores = np.zeros((n_rows, n_categories), dtype=np.int64)
+    urgency_priorities = np.full(n_rows, no_urgency, dtype=np.int64)
+
+    for row in prange(n_rows):
+        for position in range(row_offsets[row], row_offsets[row + 1]):
+            keyword_id = keyword_ids[position]
+            for category in range(n_categories):
+                type_scores[row, category] += category_table[keyword_id, category]
+            if urgency_table[keyword_id] < urgency_priorities[row]:
+                urgency_priorities[row] = urgency_table[keyword_id]
+
+    return type_scores, urgency_priorities
+
+
+def _score_keyword_rows_numpy(row_offsets, keyword_ids, category_table, urgency_table, no_urgency):
+    """
+    Vectorized NumPy equivalent of _score_keyword_rows_loop, used when
+    Numba is not installed
+    """
+    n_rows = row_offsets.shape[0] - 1
+    rows = np.repeat(np.arange(n_rows), np.diff(row_offsets))
+
+    type_scores = np.zeros((n_rows, category_table.shape[1]), dtype=np.int64)
+    np.add.at(type_scores, rows, category_table[keyword_ids])
+
+    urgency_priorities = np.full(n_rows, no_urgency, dtype=np.int64)
+    np.minimum.at(urgency_priorities, rows, urgency_table[keyword_ids])
+
+    return type_scores, urgency_priorities
+
+
+if njit is not None:
+    score_keyword_rows = njit(parallel=True, cache=True)(_score_keyword_rows_loop)
+else:
+    score_keyword_rows = _score_keyword_rows_numpy